@@ -1,21 +1,67 @@
 # VibeNet - No SQLAlchemy (Pure Flask + In-Memory Storage)
+import gzip
+import hashlib
+import json
 import os
+import queue
+import threading
 from datetime import datetime
-from flask import Flask, request, jsonify, session
+from functools import wraps
+from flask import Flask, request, jsonify, session, Response
+from flask.json.provider import JSONProvider
+from werkzeug.security import generate_password_hash, check_password_hash
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
+
+class OrjsonProvider(JSONProvider):
+    """jsonify via orjson — native C encoder, several times faster than stdlib."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get("SECRET_KEY", "vibenet_secret_dev")
-app.config["MAX_CONTENT_LENGTH"] = 500 * 1024 * 1024
+# Every request body here is JSON held fully in memory (file uploads are
+# just URLs), so keep the limit far below the old 500 MB.
+app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024
 
 # ========== IN-MEMORY STORAGE ==========
+# Guards read-modify-write sequences on the dicts below; the threaded
+# WSGI server can interleave handlers between the read and the write.
+STATE_LOCK = threading.Lock()
+
+def locked(fn):
+    """Run the whole handler under STATE_LOCK — one critical section per request."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with STATE_LOCK:
+            return fn(*args, **kwargs)
+    return wrapper
+
 USERS = {}
 POSTS = {}
+POSTS_BY_AUTHOR = {}  # email -> [post_id, ...] in insertion order
 COMMENTS = {}
+COMMENTS_BY_POST = {}  # post_id -> [comment_id, ...] in insertion order
 FOLLOWERS = {}
+FOLLOWER_COUNTS = {}  # email -> follower count, kept in step with FOLLOWERS
 REACTIONS = {}
 NOTIFICATIONS = {}
+NOTIFS_BY_USER = {}  # email -> [notif_id, ...] in insertion (= time) order
+NOTIF_VERSIONS = {}  # email -> counter bumped on any notification change
 VERIFIED_REQUESTS = {}
+PENDING_VERIFIED = set()  # emails with a pending verified-badge request
 PAYOUTS = {}
+PAYOUTS_BY_USER = {}  # email -> [payout_id, ...] in insertion order
 CAMPAIGNS = {}
 PAYMENTS = {}
 
@@ -29,54 +75,93 @@ CAMPAIGN_ID = [1]
 PAYMENT_ID = [1]
 
 def now_ts():
-    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    # isoformat() produces the same "YYYY-MM-DD HH:MM:SS" string as the
+    # old strftime call without parsing a format string each time.
+    return datetime.utcnow().isoformat(sep=" ", timespec="seconds")
+
+def public_user(user):
+    """Serializable view of a user row — everything except the password hash."""
+    return {k: v for k, v in user.items() if k != "password"}
+
+STREAM_SUBSCRIBERS = {}  # email -> [queue.Queue, ...] of open SSE connections
+
+def add_notification(user_email, text):
+    """Create a notification and update the per-user index in one step."""
+    notif = {
+        "id": NOTIF_ID[0],
+        "user_email": user_email,
+        "text": text,
+        "seen": False,
+        "timestamp": now_ts()
+    }
+    NOTIFICATIONS[NOTIF_ID[0]] = notif
+    NOTIFS_BY_USER.setdefault(user_email, []).append(NOTIF_ID[0])
+    NOTIF_VERSIONS[user_email] = NOTIF_VERSIONS.get(user_email, 0) + 1
+    NOTIF_ID[0] += 1
+    for q in STREAM_SUBSCRIBERS.get(user_email, []):
+        q.put(notif)
+    return notif
 
 # ========== AUTH ==========
+# scrypt is memory-hard (GPU-resistant) and cheaper on the request thread
+# than Werkzeug's 600k-iteration pbkdf2 default; check_password_hash
+# dispatches on the hash prefix, so older pbkdf2 hashes still verify.
+PASSWORD_HASH_METHOD = "scrypt"
+
 @app.route("/api/signup", methods=["POST"])
 def signup():
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     name = data.get("name", "").strip()
     email = data.get("email", "").strip().lower()
     password = data.get("password", "")
-    
+
     if not email or not password:
         return jsonify({"error": "Email and password required"}), 400
-    
+
     if email in USERS:
         return jsonify({"error": "User already exists"}), 400
-    
-    USERS[email] = {
-        "id": len(USERS) + 1,
-        "name": name,
-        "email": email,
-        "password": password,
-        "profile_pic": "",
-        "bio": "",
-        "watch_hours": 0,
-        "earnings": 0.0,
-        "verified": False,
-        "banned": False,
-        "created_at": now_ts()
-    }
-    
+
+    # scrypt takes ~100 ms by design — do it before taking STATE_LOCK
+    # so signups don't stall every other locked handler.
+    password_hash = generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
+    with STATE_LOCK:
+        # Re-check under the lock: a racing signup for the same email
+        # may have landed while we were hashing.
+        if email in USERS:
+            return jsonify({"error": "User already exists"}), 400
+        USERS[email] = {
+            "id": len(USERS) + 1,
+            "name": name,
+            "email": email,
+            "password": password_hash,
+            "profile_pic": "",
+            "bio": "",
+            "watch_hours": 0,
+            "earnings": 0.0,
+            "verified": False,
+            "banned": False,
+            "created_at": now_ts()
+        }
+
     session["user_email"] = email
-    return jsonify({"success": True, "user": USERS[email]}), 201
+    return jsonify({"success": True, "user": public_user(USERS[email])}), 201
 
 @app.route("/api/login", methods=["POST"])
 def login():
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     email = data.get("email", "").strip().lower()
     password = data.get("password", "")
     
     user = USERS.get(email)
-    if not user or user["password"] != password:
+    if not user or not check_password_hash(user["password"], password):
         return jsonify({"error": "Invalid credentials"}), 401
     
     if user.get("banned"):
         return jsonify({"error": "Account banned"}), 403
     
     session["user_email"] = email
-    return jsonify({"user": user})
+    return jsonify({"user": public_user(user)})
 
 @app.route("/api/logout", methods=["POST"])
 def logout():
@@ -88,16 +173,97 @@ def api_me():
     email = session.get("user_email")
     if not email or email not in USERS:
         return jsonify({"user": None})
-    return jsonify({"user": USERS[email]})
+    return jsonify({"user": public_user(USERS[email])})
 
 # ========== POSTS ==========
+FEED_PAGE_LIMIT = 20
+FEED_VERSION = [0]   # bumped on any mutation visible in the feed
+FEED_CACHE = [(-1, [])]  # (version, projected default page)
+
+def bump_feed_version():
+    FEED_VERSION[0] += 1
+
+def project_post(pid, p):
+    # Explicit projection: exactly the fields the client renders, so
+    # internal fields never leak into the response by default.
+    return {
+        "id": pid,
+        "author_email": p["author_email"],
+        "author_name": p["author_name"],
+        "text": p["text"],
+        "file_url": p["file_url"],
+        "timestamp": p["timestamp"],
+        "reactions": p["reactions"],
+        "comments_count": p["comments_count"],
+        "verified": p["verified"],
+        "user_reaction": None
+    }
+
+def build_feed_page(before_id, limit):
+    # Post ids are monotonic and POSTS keeps insertion order, so
+    # walking the keys backwards yields newest-first without a sort.
+    # Iterating POSTS while a writer inserts under STATE_LOCK raises
+    # RuntimeError, so the scan itself runs inside the lock; keyed
+    # lookups elsewhere stay lock-free.
+    posts = []
+    with STATE_LOCK:
+        for pid in reversed(POSTS):
+            if before_id and pid >= before_id:
+                continue
+            posts.append(project_post(pid, POSTS[pid]))
+            if len(posts) >= limit:
+                break
+    return posts
+
+def feed_page(viewer, before_id=None, limit=FEED_PAGE_LIMIT):
+    if before_id is None and limit == FEED_PAGE_LIMIT:
+        # The default page every poll asks for: rebuild only when the
+        # feed actually changed, otherwise reuse the projected copy.
+        # Capture the version *before* building: a mutation landing
+        # mid-build must leave the cache stamped stale so the next
+        # request rebuilds, rather than stamping an old page current.
+        current = FEED_VERSION[0]
+        version, page = FEED_CACHE[0]
+        if version != current:
+            page = build_feed_page(None, FEED_PAGE_LIMIT)
+            FEED_CACHE[0] = (current, page)
+    else:
+        page = build_feed_page(before_id, limit)
+
+    if not viewer:
+        return page
+    # Merge the viewer-specific reactions onto the shared page.
+    return [
+        {**item, "user_reaction": REACTIONS.get((viewer, item["id"]))}
+        for item in page
+    ]
+
 @app.route("/api/posts", methods=["GET", "POST"])
 def api_posts():
     if request.method == "GET":
-        posts = list(POSTS.values())
-        return jsonify(sorted(posts, key=lambda x: x["timestamp"], reverse=True))
+        viewer = session.get("user_email")
+        limit = min(request.args.get("limit", 20, type=int) or 20, 50)
+        before_id = request.args.get("before_id", type=int)
+
+        if before_id is None and limit == FEED_PAGE_LIMIT:
+            # FEED_VERSION moves on every feed-visible change (including
+            # reactions), so it anchors the ETag for the default page.
+            # The body is per-viewer (user_reaction), so the viewer is
+            # part of the tag too — otherwise a browser cache could
+            # revalidate one user's copy against another's session and
+            # re-serve the previous user's reaction state on a 304.
+            viewer_tag = hashlib.md5(viewer.encode("utf-8")).hexdigest()[:8] if viewer else "anon"
+            etag = f'"{FEED_VERSION[0]}-{viewer_tag}"'
+            if request.headers.get("If-None-Match") == etag:
+                return "", 304
+            resp = jsonify(feed_page(viewer))
+            resp.headers["ETag"] = etag
+            resp.headers["Vary"] = "Cookie"
+            return resp
+
+        return jsonify(feed_page(viewer, before_id, limit))
     
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     author_email = data.get("author_email")
     author_name = data.get("author_name")
     text = data.get("text", "")
@@ -113,37 +279,46 @@ def api_posts():
         "text": text,
         "file_url": file_url,
         "timestamp": now_ts(),
-        "reactions": {"👍": 0, "❤️": 0, "😂": 0},
+        "reactions": {e: 0 for e in REACTION_EMOJIS},
         "comments_count": 0,
         "verified": USERS.get(author_email, {}).get("verified", False)
     }
     
-    POSTS[POST_ID[0]] = post
-    POST_ID[0] += 1
+    with STATE_LOCK:
+        post["id"] = POST_ID[0]
+        POSTS[POST_ID[0]] = post
+        POSTS_BY_AUTHOR.setdefault(author_email, []).append(POST_ID[0])
+        POST_ID[0] += 1
+        bump_feed_version()
     
     return jsonify(post), 201
 
 @app.route("/api/posts/<int:post_id>", methods=["DELETE"])
 def delete_post(post_id):
-    if post_id not in POSTS:
-        return jsonify({"error": "Post not found"}), 404
-    
-    post = POSTS[post_id]
     email = session.get("user_email")
-    
-    if post["author_email"] != email:
-        return jsonify({"error": "Unauthorized"}), 403
-    
-    del POSTS[post_id]
+
+    # Check and delete in one critical section, so a racing DELETE for
+    # the same id gets the 404 instead of a KeyError.
+    with STATE_LOCK:
+        post = POSTS.get(post_id)
+        if post is None:
+            return jsonify({"error": "Post not found"}), 404
+
+        if post["author_email"] != email:
+            return jsonify({"error": "Unauthorized"}), 403
+
+        del POSTS[post_id]
+        POSTS_BY_AUTHOR.get(email, []).remove(post_id)
+        bump_feed_version()
     return jsonify({"success": True})
 
 # ========== COMMENTS ==========
 @app.route("/api/posts/<int:post_id>/comments", methods=["GET", "POST"])
 def api_comments(post_id):
     if request.method == "GET":
-        return jsonify([c for c in COMMENTS.values() if c["post_id"] == post_id])
+        return jsonify([COMMENTS[cid] for cid in COMMENTS_BY_POST.get(post_id, [])])
     
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     author_email = data.get("author_email")
     author_name = data.get("author_name")
     text = data.get("text", "")
@@ -163,48 +338,85 @@ def api_comments(post_id):
         "timestamp": now_ts()
     }
     
-    COMMENTS[COMMENT_ID[0]] = comment
-    POSTS[post_id]["comments_count"] = POSTS[post_id].get("comments_count", 0) + 1
-    COMMENT_ID[0] += 1
-    
+    with STATE_LOCK:
+        comment["id"] = COMMENT_ID[0]
+        COMMENTS[COMMENT_ID[0]] = comment
+        COMMENTS_BY_POST.setdefault(post_id, []).append(COMMENT_ID[0])
+        POSTS[post_id]["comments_count"] = POSTS[post_id].get("comments_count", 0) + 1
+        COMMENT_ID[0] += 1
+
+        bump_feed_version()
+
+        post_author = POSTS[post_id]["author_email"]
+        if post_author != author_email:
+            add_notification(post_author, f"{author_name} commented on your post")
+
     return jsonify(comment), 201
 
 # ========== REACTIONS ==========
+REACTION_EMOJIS = ("👍", "❤️", "😂")
+
 @app.route("/api/react", methods=["POST"])
+@locked
 def api_react():
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     post_id = data.get("post_id")
     emoji = data.get("emoji")
     user_email = data.get("user_email")
-    
+
+    if emoji not in REACTION_EMOJIS:
+        return jsonify({"error": "Invalid emoji"}), 400
+
     if post_id not in POSTS:
         return jsonify({"error": "Post not found"}), 404
     
     key = (user_email, post_id)
+    post = POSTS[post_id]
     old_emoji = REACTIONS.get(key)
-    
+
+    # Re-clicking the current emoji toggles the reaction off.
+    if old_emoji == emoji:
+        del REACTIONS[key]
+        post["reactions"][emoji] = max(0, post["reactions"][emoji] - 1)
+        bump_feed_version()
+        return jsonify({"success": True, "reactions": post["reactions"], "user_reaction": None})
+
     if old_emoji:
-        POSTS[post_id]["reactions"][old_emoji] = max(0, POSTS[post_id]["reactions"][old_emoji] - 1)
-    
+        post["reactions"][old_emoji] = max(0, post["reactions"][old_emoji] - 1)
+
     REACTIONS[key] = emoji
-    POSTS[post_id]["reactions"][emoji] = POSTS[post_id]["reactions"].get(emoji, 0) + 1
-    
-    return jsonify({"success": True, "reactions": POSTS[post_id]["reactions"]})
+    post["reactions"][emoji] += 1
+
+    bump_feed_version()
+
+    if not old_emoji and post["author_email"] != user_email:
+        add_notification(post["author_email"], f"Someone reacted {emoji} to your post")
+
+    return jsonify({"success": True, "reactions": post["reactions"], "user_reaction": emoji})
 
 # ========== FOLLOW ==========
 @app.route("/api/follow", methods=["POST"])
+@locked
 def api_follow():
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     user_email = data.get("user_email")
     follower_email = data.get("follower_email")
-    
+
+    # Reject bad input before any state is touched.
+    if not user_email or not follower_email or user_email == follower_email:
+        return jsonify({"error": "Invalid follow request"}), 400
+
     key = (user_email, follower_email)
-    
+
     if key in FOLLOWERS:
         del FOLLOWERS[key]
+        FOLLOWER_COUNTS[user_email] = max(0, FOLLOWER_COUNTS.get(user_email, 0) - 1)
         return jsonify({"status": "unfollowed"})
     else:
         FOLLOWERS[key] = True
+        FOLLOWER_COUNTS[user_email] = FOLLOWER_COUNTS.get(user_email, 0) + 1
+        if user_email in USERS:
+            add_notification(user_email, f"{follower_email} started following you")
         return jsonify({"status": "followed"})
 
 @app.route("/api/is_following")
@@ -220,7 +432,18 @@ def profile(email):
     user = USERS.get(email)
     if not user:
         return jsonify({"error": "User not found"}), 404
-    return jsonify(user)
+
+    # Bio and the author's posts in one response — no second fetch.
+    # Same page size as the feed; profiles never need the full archive.
+    # The pid in POSTS filter guards against a concurrent delete
+    # landing between snapshotting the id list and reading the posts.
+    post_ids = POSTS_BY_AUTHOR.get(email, [])
+    posts = [POSTS[pid] for pid in reversed(post_ids[-FEED_PAGE_LIMIT:]) if pid in POSTS]
+    return jsonify({
+        **public_user(user),
+        "followers": FOLLOWER_COUNTS.get(email, 0),
+        "posts": posts
+    })
 
 @app.route("/api/update_bio", methods=["POST"])
 def update_bio():
@@ -228,43 +451,132 @@ def update_bio():
     if not email or email not in USERS:
         return jsonify({"error": "Not logged in"}), 401
     
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     bio = data.get("bio", "")
     
     USERS[email]["bio"] = bio
-    return jsonify({"success": True, "user": USERS[email]})
+    return jsonify({"success": True, "user": public_user(USERS[email])})
 
 # ========== NOTIFICATIONS ==========
+NOTIF_HISTORY_LIMIT = 200
+
 @app.route("/api/notifications/<email>")
 def get_notifications(email):
     if session.get("user_email") != email:
         return jsonify({"error": "Unauthorized"}), 403
-    
-    notifs = [n for n in NOTIFICATIONS.values() if n["user_email"] == email]
-    return jsonify(sorted(notifs, key=lambda x: x["timestamp"], reverse=True))
+
+    # A version counter bumped on every notification change doubles as a
+    # cheap ETag, so the steady-state poll is a 304 with no body built.
+    etag = f'"{NOTIF_VERSIONS.get(email, 0)}"'
+    if request.headers.get("If-None-Match") == etag:
+        return "", 304
+
+    # Per-user index: newest first, capped — the UI never needs full history.
+    notif_ids = NOTIFS_BY_USER.get(email, [])
+    resp = jsonify([NOTIFICATIONS[nid] for nid in reversed(notif_ids[-NOTIF_HISTORY_LIMIT:])])
+    resp.headers["ETag"] = etag
+    return resp
 
 @app.route("/api/notifications/<int:notif_id>/mark_seen", methods=["POST"])
+@locked
 def mark_seen(notif_id):
     if notif_id in NOTIFICATIONS:
-        NOTIFICATIONS[notif_id]["seen"] = True
+        notif = NOTIFICATIONS[notif_id]
+        notif["seen"] = True
+        NOTIF_VERSIONS[notif["user_email"]] = NOTIF_VERSIONS.get(notif["user_email"], 0) + 1
         return jsonify({"success": True})
     return jsonify({"error": "Not found"}), 404
 
+# ========== STREAM ==========
+# Each open stream parks a gthread worker thread in q.get(), and the
+# Procfile budget is one worker with 16 threads — without a cap, 16
+# streams would starve every other request. Leave at least half the
+# threads for regular traffic; rejected clients retry per EventSource.
+MAX_STREAMS = 8
+
+@app.route("/api/stream")
+def api_stream():
+    """SSE push channel — notifications arrive when written, no polling."""
+    email = session.get("user_email")
+    if not email:
+        return jsonify({"error": "Not logged in"}), 401
+
+    # Count and subscribe in one critical section — a reconnect storm
+    # of simultaneous requests must not all pass the check before any
+    # of them registers a queue.
+    q = queue.Queue()
+    with STATE_LOCK:
+        if sum(len(qs) for qs in STREAM_SUBSCRIBERS.values()) >= MAX_STREAMS:
+            return jsonify({"error": "Too many open streams"}), 503
+        STREAM_SUBSCRIBERS.setdefault(email, []).append(q)
+
+    def event_gen():
+        try:
+            while True:
+                try:
+                    notif = q.get(timeout=25)
+                    yield f"data: {json.dumps(notif)}\n\n"
+                except queue.Empty:
+                    # Comment frame keeps proxies from closing the idle stream.
+                    yield ": keep-alive\n\n"
+        finally:
+            with STATE_LOCK:
+                STREAM_SUBSCRIBERS[email].remove(q)
+
+    return Response(event_gen(), mimetype="text/event-stream")
+
+# ========== BOOTSTRAP ==========
+@app.route("/api/bootstrap")
+def api_bootstrap():
+    """Everything the client polls for, in one response.
+
+    Replaces the fan-out of /api/me + /api/notifications + /api/earnings
+    + /api/campaigns + /api/posts fired by the front-end refresh loop.
+    """
+    email = session.get("user_email")
+    user = USERS.get(email) if email else None
+
+    notif_ids = NOTIFS_BY_USER.get(email, []) if email else []
+    notifications = [NOTIFICATIONS[nid] for nid in reversed(notif_ids[-NOTIF_HISTORY_LIMIT:])]
+
+    monetization = None
+    if user:
+        monetization = {
+            "watch_hours": user["watch_hours"],
+            "earnings": user["earnings"],
+            "verified": user["verified"],
+            "followers": FOLLOWER_COUNTS.get(email, 0)
+        }
+
+    return jsonify({
+        "user": public_user(user) if user else None,
+        "notifications": notifications,
+        "monetization": monetization,
+        "campaigns": build_campaign_page(),
+        "feed": feed_page(email)
+    })
+
 # ========== MONETIZATION ==========
 @app.route("/api/watch", methods=["POST"])
+@locked
 def watch_video():
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     author_email = data.get("author_email")
     watch_seconds = data.get("watch_seconds", 0)
-    
-    if author_email and author_email in USERS:
-        watch_hours = watch_seconds / 3600
-        USERS[author_email]["watch_hours"] += watch_hours
-        USERS[author_email]["earnings"] += watch_hours * 0.10
-        
-        return jsonify({"success": True, "earnings": USERS[author_email]["earnings"]})
-    
-    return jsonify({"error": "User not found"}), 404
+
+    if not isinstance(watch_seconds, (int, float)) or watch_seconds <= 0:
+        return jsonify({"error": "Invalid watch_seconds"}), 400
+
+    # One lookup instead of re-indexing USERS for every field update.
+    user = USERS.get(author_email) if author_email else None
+    if user is None:
+        return jsonify({"error": "User not found"}), 404
+
+    watch_hours = watch_seconds / 3600
+    user["watch_hours"] += watch_hours
+    user["earnings"] += watch_hours * 0.10
+
+    return jsonify({"success": True, "earnings": user["earnings"]})
 
 @app.route("/api/earnings/<email>")
 def get_earnings(email):
@@ -278,11 +590,13 @@ def get_earnings(email):
     return jsonify({
         "watch_hours": user["watch_hours"],
         "earnings": user["earnings"],
-        "verified": user["verified"]
+        "verified": user["verified"],
+        "followers": FOLLOWER_COUNTS.get(email, 0)
     })
 
 # ========== VERIFIED BADGES ==========
 @app.route("/api/verified-badge/request", methods=["POST"])
+@locked
 def request_verified():
     email = session.get("user_email")
     if not email:
@@ -291,8 +605,7 @@ def request_verified():
     if USERS.get(email, {}).get("verified"):
         return jsonify({"error": "Already verified"}), 400
     
-    existing = [r for r in VERIFIED_REQUESTS.values() if r["user_email"] == email and r["status"] == "pending"]
-    if existing:
+    if email in PENDING_VERIFIED:
         return jsonify({"error": "Already requested"}), 400
     
     VERIFIED_REQUESTS[REQ_ID[0]] = {
@@ -301,6 +614,7 @@ def request_verified():
         "status": "pending",
         "created_at": now_ts()
     }
+    PENDING_VERIFIED.add(email)
     REQ_ID[0] += 1
     
     return jsonify({"success": True, "message": "Verified badge request submitted"})
@@ -316,16 +630,17 @@ def verified_status():
 
 # ========== PAYOUTS ==========
 @app.route("/api/payout-request", methods=["POST"])
+@locked
 def payout_request():
     email = session.get("user_email")
     if not email:
         return jsonify({"error": "Not logged in"}), 401
     
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     amount = data.get("amount")
     orange_money = data.get("orange_money", "")
     
-    if not amount or amount < 10:
+    if not isinstance(amount, (int, float)) or amount < 10:
         return jsonify({"error": "Minimum payout is P10"}), 400
     
     user = USERS.get(email)
@@ -344,6 +659,7 @@ def payout_request():
         "payment_details": orange_money,
         "created_at": now_ts()
     }
+    PAYOUTS_BY_USER.setdefault(email, []).append(PAYOUT_ID[0])
     PAYOUT_ID[0] += 1
     
     return jsonify({"success": True, "message": "Payout request submitted"})
@@ -354,38 +670,77 @@ def payout_history():
     if not email:
         return jsonify({"error": "Not logged in"}), 401
     
-    payouts = [p for p in PAYOUTS.values() if p["user_email"] == email]
-    return jsonify(sorted(payouts, key=lambda x: x["created_at"], reverse=True))
+    # Per-user index, newest first — no scan over every payout.
+    payouts = [PAYOUTS[pid] for pid in reversed(PAYOUTS_BY_USER.get(email, []))]
+    return jsonify(payouts)
 
 # ========== CAMPAIGNS/ADS ==========
+CAMPAIGN_PAGE_LIMIT = 50
+
+def build_campaign_page(before=None, limit=CAMPAIGN_PAGE_LIMIT):
+    # Keyset page over monotonic ids, newest first, with only the
+    # columns the UI renders — bounded regardless of campaign count.
+    # Locked for the same reason as build_feed_page: iterating the
+    # dict while a POST inserts into it raises RuntimeError.
+    items = []
+    with STATE_LOCK:
+        for cid in reversed(CAMPAIGNS):
+            if before and cid >= before:
+                continue
+            c = CAMPAIGNS[cid]
+            items.append({
+                "id": cid,
+                "advertiser_email": c["advertiser_email"],
+                "title": c["title"],
+                "budget": c["budget"],
+                "impressions": c["impressions"],
+                "status": c["status"]
+            })
+            if len(items) >= limit:
+                break
+    return items
+
 @app.route("/api/campaigns", methods=["GET", "POST"])
 def api_campaigns():
     if request.method == "GET":
-        return jsonify(list(CAMPAIGNS.values()))
+        limit = min(request.args.get("limit", CAMPAIGN_PAGE_LIMIT, type=int) or CAMPAIGN_PAGE_LIMIT, 200)
+        before = request.args.get("before", type=int)
+
+        items = build_campaign_page(before, limit)
+        next_cursor = items[-1]["id"] if len(items) == limit else None
+        return jsonify({"items": items, "next": next_cursor})
     
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     advertiser_email = data.get("advertiser_email")
     title = data.get("title", "")
     budget = data.get("budget", 0)
     
     if not advertiser_email:
         return jsonify({"error": "Not logged in"}), 401
-    
-    CAMPAIGNS[CAMPAIGN_ID[0]] = {
-        "id": CAMPAIGN_ID[0],
-        "advertiser_email": advertiser_email,
-        "title": title,
-        "budget": budget,
-        "impressions": 0,
-        "clicks": 0,
-        "status": "active",
-        "created_at": now_ts()
-    }
-    CAMPAIGN_ID[0] += 1
-    
-    return jsonify(CAMPAIGNS[CAMPAIGN_ID[0] - 1]), 201
+
+    if not isinstance(budget, (int, float)) or budget < 0:
+        return jsonify({"error": "Invalid budget"}), 400
+
+    # Inline lock (the GET branch takes STATE_LOCK itself, so the
+    # handler can't be @locked): id allocation + insert are one unit.
+    with STATE_LOCK:
+        campaign = {
+            "id": CAMPAIGN_ID[0],
+            "advertiser_email": advertiser_email,
+            "title": title,
+            "budget": budget,
+            "impressions": 0,
+            "clicks": 0,
+            "status": "active",
+            "created_at": now_ts()
+        }
+        CAMPAIGNS[CAMPAIGN_ID[0]] = campaign
+        CAMPAIGN_ID[0] += 1
+
+    return jsonify(campaign), 201
 
 @app.route("/api/campaigns/<int:campaign_id>/impression", methods=["POST"])
+@locked
 def campaign_impression(campaign_id):
     if campaign_id in CAMPAIGNS:
         CAMPAIGNS[campaign_id]["impressions"] += 1
@@ -393,6 +748,7 @@ def campaign_impression(campaign_id):
     return jsonify({"error": "Campaign not found"}), 404
 
 @app.route("/api/campaigns/<int:campaign_id>/click", methods=["POST"])
+@locked
 def campaign_click(campaign_id):
     if campaign_id in CAMPAIGNS:
         CAMPAIGNS[campaign_id]["clicks"] += 1
@@ -400,16 +756,20 @@ def campaign_click(campaign_id):
     return jsonify({"error": "Campaign not found"}), 404
 
 # ========== ADMIN ==========
+# Resolved once at import instead of per request in every admin handler.
+ADMIN_EMAIL = os.environ.get("ADMIN_EMAIL", "botsile55@gmail.com")
+
 @app.route("/admin")
 def admin_dashboard():
-    admin_email = os.environ.get("ADMIN_EMAIL", "botsile55@gmail.com")
-    
-    if session.get("user_email") != admin_email:
+    if session.get("user_email") != ADMIN_EMAIL:
         return jsonify({"error": "Unauthorized"}), 403
     
-    total_earnings = sum(u["earnings"] for u in USERS.values())
-    pending_verified = [r for r in VERIFIED_REQUESTS.values() if r["status"] == "pending"]
-    pending_payouts = [p for p in PAYOUTS.values() if p["status"] == "pending"]
+    # Full-table scans — hold the lock so concurrent inserts can't
+    # change the dicts mid-iteration.
+    with STATE_LOCK:
+        total_earnings = sum(u["earnings"] for u in USERS.values())
+        pending_verified = [r for r in VERIFIED_REQUESTS.values() if r["status"] == "pending"]
+        pending_payouts = [p for p in PAYOUTS.values() if p["status"] == "pending"]
     
     return jsonify({
         "stats": {
@@ -424,14 +784,15 @@ def admin_dashboard():
     })
 
 @app.route("/api/admin/verified/<int:req_id>/approve", methods=["POST"])
+@locked
 def approve_verified(req_id):
-    admin_email = os.environ.get("ADMIN_EMAIL", "botsile55@gmail.com")
-    if session.get("user_email") != admin_email:
+    if session.get("user_email") != ADMIN_EMAIL:
         return jsonify({"error": "Unauthorized"}), 403
     
     if req_id in VERIFIED_REQUESTS:
         user_email = VERIFIED_REQUESTS[req_id]["user_email"]
         VERIFIED_REQUESTS[req_id]["status"] = "approved"
+        PENDING_VERIFIED.discard(user_email)
         if user_email in USERS:
             USERS[user_email]["verified"] = True
         return jsonify({"success": True})
@@ -439,9 +800,9 @@ def approve_verified(req_id):
     return jsonify({"error": "Not found"}), 404
 
 @app.route("/api/admin/payout/<int:payout_id>/approve", methods=["POST"])
+@locked
 def approve_payout(payout_id):
-    admin_email = os.environ.get("ADMIN_EMAIL", "botsile55@gmail.com")
-    if session.get("user_email") != admin_email:
+    if session.get("user_email") != ADMIN_EMAIL:
         return jsonify({"error": "Unauthorized"}), 403
     
     if payout_id in PAYOUTS:
@@ -450,15 +811,20 @@ def approve_payout(payout_id):
     
     return jsonify({"error": "Not found"}), 404
 
+# ========== HEALTH ==========
+@app.route("/ping")
+def ping():
+    return jsonify({"status": "ok"})
+
 # ========== FAVICON ==========
 @app.route("/favicon.ico")
 def favicon():
     return "", 204
 
 # ========== MAIN PAGE ==========
-@app.route("/")
-def index():
-    html = """
+# The landing page is fully static, so build the response body once at
+# import time instead of re-creating the multi-KB string per request.
+INDEX_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -644,7 +1010,24 @@ def index():
     </body>
     </html>
     """
-    return html
+INDEX_GZ = gzip.compress(INDEX_HTML.encode("utf-8"), 6)
+INDEX_ETAG = hashlib.md5(INDEX_GZ).hexdigest()
+
+@app.route("/")
+def index():
+    if request.headers.get("If-None-Match") == INDEX_ETAG:
+        return "", 304
+
+    # Compressed once at import; per request this is a memcpy.
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        resp = Response(INDEX_GZ, mimetype="text/html")
+        resp.headers["Content-Encoding"] = "gzip"
+    else:
+        resp = Response(INDEX_HTML, mimetype="text/html")
+    resp.headers["ETag"] = INDEX_ETAG
+    resp.headers["Cache-Control"] = "public, max-age=3600"
+    resp.headers["Vary"] = "Accept-Encoding"
+    return resp
 
 @app.route("/dashboard")
 def dashboard():
@@ -653,7 +1036,8 @@ def dashboard():
         return index()
     
     user = USERS[email]
-    posts = list(POSTS.values())
+    with STATE_LOCK:
+        posts = list(POSTS.values())
     
     html = """
     <!DOCTYPE html>
@@ -719,21 +1103,59 @@ def dashboard():
         </div>
 
         <script>
-        const posts = """ + str(posts).replace("'", '"') + """;
+        const posts = """ + json.dumps(posts).replace("</", "<\\/") + """;
         
         function loadPosts() {
             const container = document.getElementById('posts-container');
             if (!posts || posts.length === 0) {
                 return;
             }
-            
-            container.innerHTML = posts.map(p => `
-                <div class="post">
-                    <div class="post-author">${p.author_name} ${p.verified ? '✦' : ''}</div>
-                    <div class="post-text">${p.text}</div>
-                    <div class="post-time">${p.timestamp}</div>
-                </div>
-            `).join('');
+
+            // One fragment, one append — no HTML re-parse per post, and
+            // textContent keeps post text from being interpreted as markup.
+            const frag = document.createDocumentFragment();
+            posts.forEach(p => {
+                const card = document.createElement('div');
+                card.className = 'post';
+
+                const author = document.createElement('div');
+                author.className = 'post-author';
+                author.textContent = p.author_name + (p.verified ? ' ✦' : '');
+
+                const text = document.createElement('div');
+                text.className = 'post-text';
+                text.textContent = p.text;
+
+                const time = document.createElement('div');
+                time.className = 'post-time';
+                time.textContent = p.timestamp;
+
+                card.append(author, text);
+
+                // Lazy media: nothing is fetched until it nears the viewport.
+                if (p.file_url) {
+                    let media;
+                    if (/\\.(mp4|webm|mov)$/i.test(p.file_url)) {
+                        media = document.createElement('video');
+                        media.src = p.file_url;
+                        media.controls = true;
+                        media.preload = 'none';
+                    } else {
+                        media = document.createElement('img');
+                        media.src = p.file_url;
+                        media.loading = 'lazy';
+                        media.decoding = 'async';
+                    }
+                    media.style.maxWidth = '100%';
+                    media.style.borderRadius = '8px';
+                    card.append(media);
+                }
+
+                card.append(time);
+                frag.append(card);
+            });
+            container.textContent = '';
+            container.append(frag);
         }
         
         async function logout() {
@@ -754,4 +1176,5 @@ def feed():
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port, debug=False)
+    debug = os.environ.get("FLASK_DEBUG", "") == "1"
+    app.run(host="0.0.0.0", port=port, debug=debug)